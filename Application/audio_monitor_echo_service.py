@@ -5,6 +5,10 @@ Audio Monitor & Echo Service with ThingSpeak and CSV Logging
 - API modifications persist to the same file.
 - On automatic echo trigger (threshold exceeded), logs event to local CSV and sends data to ThingSpeak (fields: noise level, timestamp ISO8601).
 - Robust: state is always reset; retry on ThingSpeak failure.
+- Self-healing input device: resolved by name/pattern, sample rate negotiated,
+  reopened with exponential backoff when the microphone disappears.
+- Auto-threshold mode: tracks the ambient noise floor (streaming percentile of dBFS)
+  and triggers at floor + margin; estimator state persists in threshold_config.json.
 """
 
 import sounddevice as sd
@@ -13,6 +17,7 @@ import threading
 import time
 import json
 import os
+import re
 import requests
 from datetime import datetime, timezone
 from flask import Flask, jsonify, request
@@ -31,23 +36,43 @@ DEFAULT_CONFIG = {
     "ECHO_FEEDBACK": 0.5,
     "ECHO_START_VOL": 1.0,
     "ECHO_END_VOL": 0.3,
-    "FRAME_DURATION": 1.5
+    "FRAME_DURATION": 1.5,
+    "DEVICE_NAME": None,                   # Input device name or regex pattern (None = default input)
+    "SAMPLE_RATES": [16000, 48000, 44100], # Preferred sample rates, tried in order
+    "AUTO_THRESHOLD": False,               # Trigger at noise floor + margin instead of THRESHOLD_DBFS
+    "AUTO_THRESHOLD_MARGIN_DB": 12.0,
+    "NOISE_FLOOR_PERCENTILE": 0.2,         # Quantile of the dBFS stream taken as noise floor
+    "NOISE_FLOOR_WINDOW_SEC": 300.0,       # Time constant of the noise floor tracker
+    "NOISE_FLOOR_STATE": None              # Persisted estimator state (warm start)
 }
 
+config_lock = threading.Lock()  # Serializes writes of threshold_config.json
+
 # --- Load/save config ---
 def load_config():
     if not os.path.exists(CONFIG_PATH):
         return DEFAULT_CONFIG.copy()
-    with open(CONFIG_PATH) as f:
-        data = json.load(f)
+    try:
+        with open(CONFIG_PATH) as f:
+            data = json.load(f)
+    except ValueError as e:
+        # Corrupted file: start with defaults instead of refusing to run
+        print(f"Config load error ({e}), using defaults", flush=True)
+        return DEFAULT_CONFIG.copy()
     # Fill any missing fields with defaults
     out = DEFAULT_CONFIG.copy()
     out.update(data)
     return out
 
 def save_config(cfg):
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(cfg, f, indent=2)
+    # Atomic write: a crash mid-write never leaves a truncated config behind
+    tmp_path = CONFIG_PATH + ".tmp"
+    with config_lock:
+        with open(tmp_path, "w") as f:
+            json.dump(dict(cfg), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
 
 # --- Load ThingSpeak config (channel ID, API key) ---
 def load_thingspeak_config():
@@ -110,9 +135,55 @@ ECHO_START_VOL = config["ECHO_START_VOL"]
 ECHO_END_VOL = config["ECHO_END_VOL"]
 FRAME_DURATION = config.get("FRAME_DURATION", 1.5)
 
-SAMPLE_RATE = 16000
+AUTO_THRESHOLD = bool(config["AUTO_THRESHOLD"])
+AUTO_THRESHOLD_MARGIN_DB = config["AUTO_THRESHOLD_MARGIN_DB"]
+NOISE_FLOOR_PERCENTILE = config["NOISE_FLOOR_PERCENTILE"]
+NOISE_FLOOR_WINDOW_SEC = config["NOISE_FLOOR_WINDOW_SEC"]
+
+DEVICE_NAME = config.get("DEVICE_NAME")
+SAMPLE_RATES = config.get("SAMPLE_RATES", DEFAULT_CONFIG["SAMPLE_RATES"])
+
+SAMPLE_RATE = SAMPLE_RATES[0] if SAMPLE_RATES else 16000  # Replaced by the negotiated rate
 CHANNELS = 1
-DEVICE = None
+DEVICE = None  # Resolved input device index (set by open_input_device)
+
+# --- Device manager settings ---
+DEVICE_CACHE_TTL_SEC = 5.0
+RECONNECT_BACKOFF_MIN_SEC = 1.0
+RECONNECT_BACKOFF_MAX_SEC = 30.0
+
+device_state = {
+    "healthy": False,
+    "index": None,
+    "name": None,
+    "sample_rate": None,
+    "reconnects": 0,
+    "last_error": None,
+    "backoff_sec": RECONNECT_BACKOFF_MIN_SEC,
+    "next_retry": 0.0,
+    "opened_once": False
+}
+device_lock = threading.Lock()
+audio_lock = threading.Lock()  # Serializes PortAudio re-init, recording and playback
+device_cache = {"devices": None, "fetched": 0.0}
+
+# --- Noise floor tracker settings ---
+NOISE_FLOOR_GAIN = 4.0          # Step gain of the quantile tracker (in units of spread)
+NOISE_FLOOR_SAVE_SEC = 600.0      # State is saved at least this often (SD card wear)
+NOISE_FLOOR_SAVE_MIN_SEC = 60.0   # Earliest save when the floor moved or warm-up completed
+NOISE_FLOOR_SAVE_DELTA_DB = 1.0   # Floor movement that justifies an early save
+NOISE_FLOOR_MAX_AGE_WINDOWS = 6   # Saved state older than this many windows must warm up again
+
+NOISE_FLOOR_EMPTY = {
+    "floor_dbfs": None,
+    "spread_db": 1.0,
+    "samples": 0,
+    "updated": 0.0,
+    "device": None
+}
+noise_floor = dict(NOISE_FLOOR_EMPTY)
+noise_floor_lock = threading.Lock()
+noise_floor_saved = {"time": time.time(), "floor_dbfs": None, "warmed_up": False}
 
 current_volume = {
     "rms": 0.0,
@@ -158,16 +229,271 @@ def create_echo_buffer(audio, taps, delay_sec, feedback, start_vol, end_vol):
         out[start:end] += echo
     return out, envelope
 
+# --- Audio device manager ---
+def query_devices_cached(refresh=False):
+    """Return sd.query_devices() as a list, cached for DEVICE_CACHE_TTL_SEC.
+    refresh=True re-initializes PortAudio so hot-plugged devices are enumerated."""
+    now = time.time()
+    if (refresh or device_cache["devices"] is None
+            or now - device_cache["fetched"] > DEVICE_CACHE_TTL_SEC):
+        if refresh:
+            # PortAudio only scans devices on init: restart it to see re-plugged mics.
+            # sounddevice has no public API for this, so we rely on its private
+            # _terminate()/_initialize(); re-check after upgrading sounddevice.
+            with audio_lock:
+                sd._terminate()
+                sd._initialize()
+        device_cache["devices"] = [dict(d, index=i) for i, d in enumerate(sd.query_devices())]
+        device_cache["fetched"] = now
+    return device_cache["devices"]
+
+def has_microphone(devices=None):
+    """Check if at least one input device with channels is available."""
+    try:
+        if devices is None:
+            devices = query_devices_cached()
+        for d in devices:
+            if d['max_input_channels'] > 0:
+                return True
+        return False
+    except Exception as e:
+        log(f"Error while querying devices: {e}")
+        return False
+
+def resolve_input_device(devices):
+    """Find the input device matching DEVICE_NAME (substring or regex, case-insensitive).
+    Without DEVICE_NAME, use the system default input or the first input available."""
+    inputs = [d for d in devices if d['max_input_channels'] > 0]
+    if DEVICE_NAME:
+        for d in inputs:
+            name = d['name']
+            if DEVICE_NAME.lower() in name.lower():
+                return d
+            try:
+                if re.search(DEVICE_NAME, name, re.IGNORECASE):
+                    return d
+            except re.error:
+                pass
+        return None
+    default_in = sd.default.device[0]
+    for d in inputs:
+        if d['index'] == default_in:
+            return d
+    return inputs[0] if inputs else None
+
+def negotiate_sample_rate(dev):
+    """Return the first rate of SAMPLE_RATES (then the device default) the device accepts."""
+    candidates = list(SAMPLE_RATES) + [int(dev['default_samplerate'])]
+    for rate in candidates:
+        try:
+            sd.check_input_settings(device=dev['index'], channels=CHANNELS,
+                                    dtype='int16', samplerate=rate)
+            return int(rate)
+        except Exception:
+            continue
+    raise RuntimeError(f"No supported sample rate for '{dev['name']}' (tried {candidates})")
+
+def open_input_device(refresh=False):
+    """Resolve the input device and negotiate its sample rate. Raises on failure."""
+    global DEVICE, SAMPLE_RATE
+    devices = query_devices_cached(refresh=refresh)
+    if not has_microphone(devices):
+        raise RuntimeError("No microphone detected")
+    dev = resolve_input_device(devices)
+    if dev is None:
+        raise RuntimeError(f"No input device matching '{DEVICE_NAME}'")
+    rate = negotiate_sample_rate(dev)
+    DEVICE = dev['index']
+    SAMPLE_RATE = rate
+    with noise_floor_lock:
+        if noise_floor["device"] not in (None, dev['name']):
+            # Another microphone: its noise floor does not apply
+            log("Input device changed, noise floor estimate reset")
+            noise_floor.update(NOISE_FLOOR_EMPTY)
+        noise_floor["device"] = dev['name']
+    # Backoff and last_error are only cleared by mark_device_ok(), once a frame
+    # has actually been recorded: a device that enumerates but fails in sd.rec
+    # keeps backing off instead of cycling every second.
+    with device_lock:
+        device_state.update({
+            "healthy": True,
+            "index": DEVICE,
+            "name": dev['name'],
+            "sample_rate": SAMPLE_RATE,
+            "next_retry": 0.0
+        })
+
+def mark_device_ok():
+    """Called after a successful recording: reset the backoff and count the reconnect."""
+    with device_lock:
+        if device_state["last_error"] is None and device_state["opened_once"]:
+            return
+        if device_state["opened_once"]:
+            device_state["reconnects"] += 1
+        device_state.update({
+            "last_error": None,
+            "backoff_sec": RECONNECT_BACKOFF_MIN_SEC,
+            "opened_once": True
+        })
+        index, name, rate = device_state["index"], device_state["name"], device_state["sample_rate"]
+    log(f"Input device ready: [{index}] {name} @ {rate} Hz")
+
+def mark_device_error(err):
+    """Flag the device as unhealthy and schedule the next reopen with exponential backoff."""
+    with device_lock:
+        # "Lost" only for a device that was recording fine, not for a failed first open
+        was_healthy = (device_state["healthy"] and device_state["opened_once"]
+                       and device_state["last_error"] is None)
+        if device_state["last_error"] is None:
+            # First failure (device lost, or first open at startup): retry quickly
+            delay = RECONNECT_BACKOFF_MIN_SEC
+        else:
+            delay = min(device_state["backoff_sec"] * 2, RECONNECT_BACKOFF_MAX_SEC)
+        device_state.update({
+            "healthy": False,
+            "last_error": str(err),
+            "backoff_sec": delay,
+            "next_retry": time.time() + delay
+        })
+    device_cache["devices"] = None
+    if was_healthy:
+        log(f"Audio device lost: {err}")
+    log(f"Audio device unavailable, retrying in {delay:.0f}s ({err})")
+
+def record_frame():
+    """Record one FRAME_DURATION block from the input device as float32."""
+    with audio_lock:
+        audio = sd.rec(int(FRAME_DURATION * SAMPLE_RATE),
+                       samplerate=SAMPLE_RATE,
+                       channels=CHANNELS, dtype='int16', device=DEVICE)
+        sd.wait()
+    return audio.astype(np.float32)
+
+# --- Adaptive noise floor ---
+def noise_floor_warmup_samples():
+    """Frames needed before the estimate is trusted: about one tracking window."""
+    return int(np.ceil(NOISE_FLOOR_WINDOW_SEC / FRAME_DURATION))
+
+def restore_noise_floor(state):
+    """Load the persisted estimator state, ignoring it if malformed or much
+    older than the tracking window."""
+    if not isinstance(state, dict):
+        return
+    try:
+        floor = float(state["floor_dbfs"])
+        spread = float(state["spread_db"])
+        samples = int(state["samples"])
+        updated = float(state["updated"])
+    except (KeyError, TypeError, ValueError):
+        log("Saved noise floor state is invalid, starting from scratch")
+        return
+    if not (np.isfinite(floor) and np.isfinite(spread) and spread > 0 and samples >= 0):
+        log("Saved noise floor state is invalid, starting from scratch")
+        return
+    # The state on disk may lag the last frame by up to NOISE_FLOOR_SAVE_SEC
+    max_age = NOISE_FLOOR_MAX_AGE_WINDOWS * NOISE_FLOOR_WINDOW_SEC + NOISE_FLOOR_SAVE_SEC
+    age = time.time() - updated
+    if not 0 <= age <= max_age:
+        log(f"Saved noise floor state is stale ({age:.0f}s old), warming up again")
+        return
+    with noise_floor_lock:
+        noise_floor.update({
+            "floor_dbfs": floor,
+            "spread_db": spread,
+            "samples": samples,
+            "updated": updated,
+            "device": state.get("device")
+        })
+    noise_floor_saved.update({"floor_dbfs": floor, "warmed_up": samples >= noise_floor_warmup_samples()})
+    log(f"Noise floor restored: {floor:.1f} dBFS ({samples} samples)")
+
+def update_noise_floor(dbfs):
+    """Streaming quantile estimate of the dBFS stream, O(1) time and memory per frame.
+    The estimate moves up by gain*p and down by gain*(1-p) (scaled by the running
+    spread), so it settles where a fraction p of frames is below it; older frames
+    fade out with time constant NOISE_FLOOR_WINDOW_SEC. During warm-up the gain is
+    raised to 1/n, with the step capped at the distance to the new frame, so the
+    estimate moves quickly away from the first frame without overshooting."""
+    if not np.isfinite(dbfs):
+        return
+    with noise_floor_lock:
+        alpha = min(1.0, max(FRAME_DURATION / max(NOISE_FLOOR_WINDOW_SEC, FRAME_DURATION),
+                             1.0 / (noise_floor["samples"] + 1)))
+        q = noise_floor["floor_dbfs"]
+        if q is None:
+            q = float(dbfs)
+        else:
+            spread = noise_floor["spread_db"]
+            spread += alpha * (abs(dbfs - q) - spread)
+            spread = max(spread, 0.1)
+            step = min(NOISE_FLOOR_GAIN * alpha * spread, abs(dbfs - q))
+            if dbfs < q:
+                q -= step * (1.0 - NOISE_FLOOR_PERCENTILE)
+            else:
+                q += step * NOISE_FLOOR_PERCENTILE
+            noise_floor["spread_db"] = float(spread)
+        noise_floor["floor_dbfs"] = float(q)
+        noise_floor["samples"] += 1
+        noise_floor["updated"] = time.time()
+        state = dict(noise_floor)
+    save_noise_floor(state)
+
+def save_noise_floor(state):
+    """Persist the estimator state every NOISE_FLOOR_SAVE_SEC, so the saved
+    timestamp never goes stale while running; save earlier (but not more often
+    than NOISE_FLOOR_SAVE_MIN_SEC) when the floor moved or the warm-up completed."""
+    now = time.time()
+    elapsed = now - noise_floor_saved["time"]
+    if elapsed < NOISE_FLOOR_SAVE_MIN_SEC:
+        return
+    warmed_up = state["samples"] >= noise_floor_warmup_samples()
+    last = noise_floor_saved["floor_dbfs"]
+    changed = (last is None or abs(state["floor_dbfs"] - last) >= NOISE_FLOOR_SAVE_DELTA_DB
+               or warmed_up != noise_floor_saved["warmed_up"])
+    if elapsed < NOISE_FLOOR_SAVE_SEC and not changed:
+        return
+    noise_floor_saved.update({"time": now, "floor_dbfs": state["floor_dbfs"], "warmed_up": warmed_up})
+    config["NOISE_FLOOR_STATE"] = state
+    try:
+        save_config(config)
+    except Exception as e:
+        log(f"Noise floor state save error: {e}")
+
+def effective_threshold():
+    """Trigger level in use: noise floor + margin in auto mode (once warmed up), else THRESHOLD_DBFS."""
+    if AUTO_THRESHOLD:
+        with noise_floor_lock:
+            floor = noise_floor["floor_dbfs"]
+            samples = noise_floor["samples"]
+        if floor is not None and samples >= noise_floor_warmup_samples():
+            return floor + AUTO_THRESHOLD_MARGIN_DB
+    return THRESHOLD_DBFS
+
 def monitor_thread():
     global current_volume, mic_enabled
     while True:
         if mic_enabled:
+            with device_lock:
+                healthy = device_state["healthy"]
+                wait = device_state["next_retry"] - time.time()
+                failed_before = device_state["last_error"] is not None
+            if not healthy:
+                if wait > 0:
+                    time.sleep(min(wait, 0.5))
+                    continue
+                try:
+                    open_input_device(refresh=failed_before)
+                except Exception as e:
+                    mark_device_error(e)
+                    continue
+            try:
+                arr = record_frame()
+            except Exception as e:
+                # Any recording failure goes through the backoff, never a fixed-rate retry loop
+                mark_device_error(e)
+                continue
+            mark_device_ok()
             try:
-                audio = sd.rec(int(FRAME_DURATION * SAMPLE_RATE),
-                               samplerate=SAMPLE_RATE,
-                               channels=CHANNELS, dtype='int16', device=DEVICE)
-                sd.wait()
-                arr = audio.astype(np.float32)
                 rms = np.sqrt(np.mean(arr**2))
                 dbfs = rms_to_dbfs(rms)
                 with lock:
@@ -176,12 +502,14 @@ def monitor_thread():
                         "dbfs": float(dbfs),
                         "updated": time.time()
                     }
-                if dbfs > THRESHOLD_DBFS:
+                update_noise_floor(dbfs)
+                if dbfs > effective_threshold():
                     log(f"Threshold exceeded! dbfs={dbfs:.1f}. Triggering echo...")
                     # Only the automatic trigger will log event to cloud/CSV
                     trigger_echo(arr.flatten(), trigger_type="auto", dbfs=dbfs)
             except Exception as e:
-                log(f"Audio monitor error: {e}")
+                # Processing/trigger failure: not a device problem, no reconnect
+                log(f"Audio processing error: {e}")
                 time.sleep(1)
         else:
             time.sleep(0.05)
@@ -201,6 +529,7 @@ def trigger_echo(audio_frame, trigger_type="auto", dbfs=None):
         ECHO_END_VOL
     )
     echo_audio = np.clip(echo_audio, -32768, 32767).astype(np.int16)
+    rate = SAMPLE_RATE
     mic_enabled = False
     echo_active = True
 
@@ -219,19 +548,21 @@ def trigger_echo(audio_frame, trigger_type="auto", dbfs=None):
                 log(f"[ThingSpeak] Unexpected error: {e}")
         # --- Playback and UI state ---
         try:
-            sd.play(echo_audio, samplerate=SAMPLE_RATE, device=DEVICE)
-            # Animate echo_level: step for each tap
-            for i, tap_env in enumerate(envelope):
+            with audio_lock:
+                # Play on the default output: DEVICE is the resolved *input* index
+                sd.play(echo_audio, samplerate=rate, device=None)
+                # Animate echo_level: step for each tap
+                for i, tap_env in enumerate(envelope):
+                    with echo_level_lock:
+                        echo_level = float(tap_env)
+                    if i == 0:
+                        time.sleep(FRAME_DURATION)
+                    else:
+                        time.sleep(ECHO_DELAY_SEC)
                 with echo_level_lock:
-                    echo_level = float(tap_env)
-                if i == 0:
-                    time.sleep(FRAME_DURATION)
-                else:
-                    time.sleep(ECHO_DELAY_SEC)
-            with echo_level_lock:
-                echo_level = float(ECHO_END_VOL)
-            #sd.wait(timeout=int(FRAME_DURATION + ECHO_DELAY_SEC * len(envelope) + 2))
-            sd.wait()
+                    echo_level = float(ECHO_END_VOL)
+                #sd.wait(timeout=int(FRAME_DURATION + ECHO_DELAY_SEC * len(envelope) + 2))
+                sd.wait()
             log("Echo playback finished.")
         except Exception as e:
             log(f"Echo playback error: {e}")
@@ -251,22 +582,44 @@ def api_get_volume():
 
 @api_app.route('/threshold', methods=['GET', 'POST'])
 def api_threshold():
-    global THRESHOLD_DBFS, config
+    global THRESHOLD_DBFS, AUTO_THRESHOLD, AUTO_THRESHOLD_MARGIN_DB, config
     if request.method == 'POST':
         data = request.get_json(force=True)
-        if "threshold_dbfs" in data:
-            try:
-                val = float(data["threshold_dbfs"])
-                THRESHOLD_DBFS = val
-                config["THRESHOLD_DBFS"] = val
-                save_config(config)
-                log(f"Threshold updated via API: {val:.1f} dBFS")
-                return jsonify({"status": "ok", "threshold_dbfs": THRESHOLD_DBFS})
-            except Exception:
-                return jsonify({"status": "error", "message": "Invalid value"}), 400
-        return jsonify({"status": "error", "message": "Missing field"}), 400
+        if not any(k in data for k in ("threshold_dbfs", "auto", "margin_db")):
+            return jsonify({"status": "error", "message": "Missing field"}), 400
+        try:
+            # Validate every field before applying any of them
+            threshold = float(data.get("threshold_dbfs", THRESHOLD_DBFS))
+            auto = data.get("auto", AUTO_THRESHOLD)
+            if not isinstance(auto, bool):
+                # bool("false") is True: only accept real JSON booleans
+                raise ValueError("auto must be a JSON boolean")
+            margin = float(data.get("margin_db", AUTO_THRESHOLD_MARGIN_DB))
+            THRESHOLD_DBFS = threshold
+            AUTO_THRESHOLD = auto
+            AUTO_THRESHOLD_MARGIN_DB = margin
+            config["THRESHOLD_DBFS"] = THRESHOLD_DBFS
+            config["AUTO_THRESHOLD"] = AUTO_THRESHOLD
+            config["AUTO_THRESHOLD_MARGIN_DB"] = AUTO_THRESHOLD_MARGIN_DB
+            save_config(config)
+            log(f"Threshold updated via API: {THRESHOLD_DBFS:.1f} dBFS, "
+                f"auto={AUTO_THRESHOLD}, margin={AUTO_THRESHOLD_MARGIN_DB:.1f} dB")
+            return jsonify({
+                "status": "ok",
+                "threshold_dbfs": THRESHOLD_DBFS,
+                "auto": AUTO_THRESHOLD,
+                "margin_db": AUTO_THRESHOLD_MARGIN_DB,
+                "effective_dbfs": effective_threshold()
+            })
+        except Exception:
+            return jsonify({"status": "error", "message": "Invalid value"}), 400
     else:
-        return jsonify({"threshold_dbfs": THRESHOLD_DBFS})
+        return jsonify({
+            "threshold_dbfs": THRESHOLD_DBFS,
+            "auto": AUTO_THRESHOLD,
+            "margin_db": AUTO_THRESHOLD_MARGIN_DB,
+            "effective_dbfs": effective_threshold()
+        })
 
 @api_app.route('/echo_params', methods=['GET', 'POST'])
 def api_echo_params():
@@ -338,12 +691,12 @@ def api_lockout():
 def api_start_echo():
     if not mic_enabled:
         return jsonify({"status": "error", "message": "Mic is locked out"}), 403
+    with device_lock:
+        healthy = device_state["healthy"]
+    if not healthy:
+        return jsonify({"status": "error", "message": "Microphone unavailable"}), 503
     try:
-        audio = sd.rec(int(FRAME_DURATION * SAMPLE_RATE),
-                       samplerate=SAMPLE_RATE,
-                       channels=CHANNELS, dtype='int16', device=DEVICE)
-        sd.wait()
-        arr = audio.astype(np.float32)
+        arr = record_frame()
         # Manual trigger: do not log to ThingSpeak/CSV
         threading.Thread(target=trigger_echo, args=(arr.flatten(), "manual", None), daemon=True).start()
         log("Manual echo triggered via API.")
@@ -357,12 +710,27 @@ def api_status():
         v = dict(current_volume)
     with echo_level_lock:
         level = float(echo_level)
+    with device_lock:
+        dev = dict(device_state)
+    with noise_floor_lock:
+        nf = dict(noise_floor)
     status = {
         "mic_enabled": mic_enabled,
         "last_rms": v["rms"],
         "last_dbfs": v["dbfs"],
         "updated": v["updated"],
         "threshold_dbfs": THRESHOLD_DBFS,
+        "threshold_effective_dbfs": effective_threshold(),
+        "auto_threshold": {
+            "enabled": AUTO_THRESHOLD,
+            "margin_db": AUTO_THRESHOLD_MARGIN_DB,
+            "noise_floor_dbfs": nf["floor_dbfs"],
+            "spread_db": nf["spread_db"],
+            "samples": nf["samples"],
+            "warmed_up": nf["floor_dbfs"] is not None and nf["samples"] >= noise_floor_warmup_samples(),
+            "percentile": NOISE_FLOOR_PERCENTILE,
+            "window_sec": NOISE_FLOOR_WINDOW_SEC
+        },
         "echo_params": {
             "delay_sec": ECHO_DELAY_SEC,
             "taps": ECHO_TAPS,
@@ -373,12 +741,22 @@ def api_status():
             "active": echo_active,
             "level": level
         },
-        "lockout_sec": LOCKOUT_SEC
+        "lockout_sec": LOCKOUT_SEC,
+        "device": {
+            "healthy": dev["healthy"],
+            "index": dev["index"],
+            "name": dev["name"],
+            "sample_rate": dev["sample_rate"],
+            "reconnects": dev["reconnects"],
+            "last_error": dev["last_error"],
+            "retry_in_sec": max(0.0, dev["next_retry"] - time.time()) if not dev["healthy"] else 0.0
+        }
     }
     return jsonify(status)
 
 if __name__ == '__main__':
     log("Starting Audio Monitor + Echo + ThingSpeak+CSV Logging API Service...")
+    restore_noise_floor(config.get("NOISE_FLOOR_STATE"))
     t = threading.Thread(target=monitor_thread, daemon=True)
     t.start()
     api_app.run(host='127.0.0.1', port=8080, threaded=True)
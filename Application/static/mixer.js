@@ -3,6 +3,7 @@ document.addEventListener("DOMContentLoaded", async function() {
     // --- Default "center" values ---
     const paramCenters = {
         "THRESHOLD_DBFS": -25.0,
+        "AUTO_THRESHOLD_MARGIN_DB": 12.0,
         "LOCKOUT_SEC": 2.0,
         "ECHO_DELAY_SEC": 0.25,
         "ECHO_TAPS": 3,
@@ -16,6 +17,8 @@ document.addEventListener("DOMContentLoaded", async function() {
         // label, type, param, min, max, step, format, extra
         { label: "VOLUME", type: "vmeter" },
         { label: "THRESHOLD", type: "slider", param: "THRESHOLD_DBFS", min: -50, max: 0, step: 0.5, format: v => v.toFixed(1) + " dBFS" },
+        { label: "AUTO THR", type: "lamp", state: "auto_threshold", on: true, on_label: "AUTO", off_label: "MANUAL", toggle: { api: "/api/threshold", key: "auto" } },
+        { label: "AUTO MARGIN", type: "slider", param: "AUTO_THRESHOLD_MARGIN_DB", min: 0, max: 30, step: 0.5, format: v => v.toFixed(1) + " dB" },
         { label: "MIC STATUS", type: "lamp", state: "mic_enabled", on: true, on_label: "ON", off_label: "OFF" },
         { label: "LOCKOUT", type: "slider", param: "LOCKOUT_SEC", min: 0, max: 10, step: 0.1, format: v => v.toFixed(1) + " s" },
         { label: "ECHO STATUS", type: "lamp", state: "echo_active", on: true, on_label: "ON", off_label: "OFF" },
@@ -30,6 +33,7 @@ document.addEventListener("DOMContentLoaded", async function() {
 
     const paramMap = {
         "THRESHOLD_DBFS": { api: "/api/threshold", key: "threshold_dbfs" },
+        "AUTO_THRESHOLD_MARGIN_DB": { api: "/api/threshold", key: "margin_db" },
         "LOCKOUT_SEC": { api: "/api/lockout", key: "lockout_sec" },
         "ECHO_DELAY_SEC": { api: "/api/echo_params", key: "delay_sec" },
         "ECHO_TAPS": { api: "/api/echo_params", key: "taps" },
@@ -43,6 +47,7 @@ document.addEventListener("DOMContentLoaded", async function() {
 
     // --- Fetch initial values from backend before rendering UI ---
     let initialValues = {};
+    let initialLamps = {};
     try {
         const resp = await fetch("/api/status");
         if (resp.ok) {
@@ -51,6 +56,10 @@ document.addEventListener("DOMContentLoaded", async function() {
                 "THRESHOLD_DBFS": data.threshold_dbfs,
                 "LOCKOUT_SEC": data.lockout_sec,
             };
+            if (data.auto_threshold) {
+                initialValues["AUTO_THRESHOLD_MARGIN_DB"] = data.auto_threshold.margin_db;
+                initialLamps["auto_threshold"] = !!data.auto_threshold.enabled;
+            }
             if (data.echo_params) {
                 initialValues["ECHO_DELAY_SEC"] = data.echo_params.delay_sec;
                 initialValues["ECHO_TAPS"] = data.echo_params.taps;
@@ -116,6 +125,30 @@ document.addEventListener("DOMContentLoaded", async function() {
             col.lampOn = def.on;
             col.lampOnLabel = def.on_label;
             col.lampOffLabel = def.off_label;
+            col.lampActive = !!initialLamps[def.state];
+            if (def.toggle) {
+                // Clickable lamp: flips the boolean setting on the backend
+                lamp.style.cursor = "pointer";
+                lamp.addEventListener("click", async function(e) {
+                    const wanted = !col.lampActive;
+                    let payload = {};
+                    payload[def.toggle.key] = wanted;
+                    try {
+                        const resp = await fetch(def.toggle.api, {
+                            method: "POST",
+                            headers: { "Content-Type": "application/json" },
+                            body: JSON.stringify(payload)
+                        });
+                        // The proxy may answer 200 with the backend's error body
+                        const result = await resp.json();
+                        if (!resp.ok || result.status !== "ok") throw new Error(result.message || result.error || resp.status);
+                        col.lampActive = wanted;
+                    } catch (err) {
+                        console.error("Toggle " + def.label + " failed:", err);
+                        stateLabel.textContent = "ERROR";
+                    }
+                });
+            }
         }
         else if (def.type === "slider") {
             const sliderContainer = document.createElement("div");
@@ -237,6 +270,7 @@ document.addEventListener("DOMContentLoaded", async function() {
                         let v = null;
                         if (p === "THRESHOLD_DBFS") v = data.threshold_dbfs;
                         else if (p === "LOCKOUT_SEC") v = data.lockout_sec;
+                        else if (p === "AUTO_THRESHOLD_MARGIN_DB" && data.auto_threshold) v = data.auto_threshold.margin_db;
                         else if (data.echo_params && p.startsWith("ECHO_")) {
                             if (p === "ECHO_DELAY_SEC") v = data.echo_params.delay_sec;
                             if (p === "ECHO_TAPS") v = data.echo_params.taps;
@@ -260,8 +294,14 @@ document.addEventListener("DOMContentLoaded", async function() {
                         // Use data from backend: echo_params.active
                         state = !!(data.echo_params && data.echo_params.active);
                     }
+                    if (c.lampState === "auto_threshold") state = !!(data.auto_threshold && data.auto_threshold.enabled);
+                    c.lampActive = state;
                     c.lamp.className = "lamp " + (state ? "green" : "red");
                     c.lampLabel.textContent = state ? c.lampOnLabel : c.lampOffLabel;
+                    if (c.lampState === "auto_threshold" && data.threshold_effective_dbfs !== undefined) {
+                        // Show the trigger level actually in use (floor + margin in auto mode)
+                        c.lampLabel.textContent += " " + Number(data.threshold_effective_dbfs).toFixed(1) + " dBFS";
+                    }
                 }
                 if (c.timerValue && data.echo_params) {
                     // Animate echo volume: show live value if echo active, else end value